@@ -17,21 +17,11 @@ from pathlib import Path
 
 import requests
 import uvicorn
-from dotenv import load_dotenv
-from supabase import create_client
 
-from config import load_config, clear_config, CONFIG_FILE
+from config import load_config, load_environment, clear_config, CONFIG_FILE
 
 # Load environment: .env (local override) or .env.public (bundled defaults)
-_env_file = Path(".env")
-if _env_file.exists():
-    load_dotenv(_env_file)
-else:
-    # Load bundled .env.public from package directory
-    _package_dir = Path(__file__).parent
-    _public_env = _package_dir / ".env.public"
-    if _public_env.exists():
-        load_dotenv(_public_env)
+load_environment()
 
 # Version from pyproject.toml (single source of truth)
 try:
@@ -60,6 +50,9 @@ def fetch_user_info(access_token: str) -> dict:
         return {}
 
     try:
+        # Imported here: supabase pulls in a large dependency tree that most
+        # CLI commands never need
+        from supabase import create_client
         supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
         response = supabase.auth.get_user(access_token)
         if response and response.user:
@@ -610,7 +603,7 @@ def _run_server(config):
     tunnel_process = run_cloudflared_tunnel(config.tunnel_token)
 
     try:
-        uvicorn.run("main:app", host="0.0.0.0", port=8766, log_level="info")
+        uvicorn.run("main:app", host="0.0.0.0", port=8766, log_level="info", access_log=False, server_header=False)
     finally:
         if tunnel_process:
             tunnel_process.terminate()
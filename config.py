@@ -1,6 +1,7 @@
 """Config management for simple-mcp-server."""
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -52,6 +53,26 @@ class Config:
         return bool(self.robot_name and self.tunnel_token)
 
 
+@lru_cache(maxsize=None)
+def load_environment() -> None:
+    """Load .env (local override) or the bundled .env.public into os.environ.
+
+    Both the CLI and the server call this at import; the cache makes the
+    second call (cli.py starting main:app in the same process) a no-op.
+    """
+    from dotenv import load_dotenv
+
+    env_file = Path(".env")
+    if env_file.exists():
+        load_dotenv(env_file)
+        return
+
+    # Bundled .env.public from the package directory
+    public_env = Path(__file__).parent / ".env.public"
+    if public_env.exists():
+        load_dotenv(public_env)
+
+
 def load_config() -> Config:
     """Load config from file."""
     if not CONFIG_FILE.exists():
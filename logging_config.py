@@ -4,13 +4,17 @@ This module provides:
 - JSONFormatter for structured logging
 - SupabaseHandler for centralized log collection (batched)
 - Fallback to stderr-only when Supabase is unavailable
+
+Callers should log with lazy %-style arguments (``logger.info("[TAG] %s", x)``)
+rather than f-strings so records dropped by level or filter are never
+formatted. Lint with pylint's ``logging-fstring-interpolation`` and
+``logging-not-lazy`` checks.
 """
 
 import atexit
 import json
 import logging
 import os
-import re
 import sys
 import threading
 import time
@@ -19,6 +23,37 @@ from queue import Queue, Empty
 from typing import Optional
 
 
+def _record_message(record: logging.LogRecord) -> str:
+    """Return the record's formatted message, computing it at most once.
+
+    The result is cached on ``record.message`` (the same attribute
+    ``logging.Formatter.format`` uses), so the filter, formatter and
+    handler all share one ``getMessage()`` call per record.
+    """
+    message = record.__dict__.get("message")
+    if message is None:
+        message = record.message = record.getMessage()
+    return message
+
+
+_TAG_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+
+
+def _split_tag(message: str) -> tuple[Optional[str], str]:
+    """Split a leading ``[TAG]`` off a message.
+
+    A tag is one or more of ``A-Z`` and ``_`` in square brackets at the very
+    start of the message. Plain string operations are cheaper than the regex
+    engine here, especially for the common untagged case.
+    Returns ``(tag, rest)`` or ``(None, message)``.
+    """
+    if message[:1] == "[":
+        end = message.find("]", 1)
+        if end > 1 and _TAG_CHARS.issuperset(message[1:end]):
+            return message[1:end], message[end + 1:].lstrip()
+    return None, message
+
+
 class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
 
@@ -26,28 +61,31 @@ class JSONFormatter(logging.Formatter):
         super().__init__()
         self.robot_name = robot_name or "unknown"
         self.user_id = user_id
+        # Fields fixed for this formatter's lifetime; format() copies this
+        # template and fills in only the per-record fields.
+        self._template = {
+            "robot_name": self.robot_name,
+            "user_id": self.user_id,
+            "level": None,
+            "tag": None,
+            "message": None,
+            "module": None,
+            "extra": None,
+        }
 
     def format(self, record: logging.LogRecord) -> dict:
         # Extract tag from message if present: [TAG] message
-        tag = None
-        message = record.getMessage()
-        tag_match = re.match(r'\[([A-Z_]+)\]\s*(.*)', message)
-        if tag_match:
-            tag = tag_match.group(1)
-            message = tag_match.group(2)
+        tag, message = _split_tag(_record_message(record))
 
         # Build structured log entry
-        log_entry = {
-            "robot_name": self.robot_name,
-            "user_id": self.user_id,
-            "level": record.levelname,
-            "tag": tag,
-            "message": message,
-            "module": record.module,
-            "extra": {
-                "function": record.funcName,
-                "line": record.lineno,
-            }
+        log_entry = self._template.copy()
+        log_entry["level"] = record.levelname
+        log_entry["tag"] = tag
+        log_entry["message"] = message
+        log_entry["module"] = record.module
+        log_entry["extra"] = {
+            "function": record.funcName,
+            "line": record.lineno,
         }
 
         # Add exception info if present
@@ -96,10 +134,9 @@ class SupabaseFilter(logging.Filter):
             return False
 
         # Check for tag in message
-        message = record.getMessage()
-        tag_match = re.match(r'\[([A-Z_]+)\]', message)
-        if tag_match:
-            tag = tag_match.group(1)
+        message = _record_message(record)
+        tag, _ = _split_tag(message)
+        if tag:
             # Skip AUTH "Request authorized" (too noisy - logs every request)
             if tag == 'AUTH' and 'Request authorized' in message:
                 return False
@@ -109,11 +146,86 @@ class SupabaseFilter(logging.Filter):
         return False
 
 
+class _SupabaseDispatcher:
+    """Process-wide log queue and flush thread shared by all SupabaseHandlers.
+
+    Each handler stamps its own robot_name/user_id onto the entries it
+    enqueues, so a single background thread can batch logs for every robot
+    hosted in the process. Entries are grouped by Supabase client on send.
+    The thread starts with the first registered handler and exits once the
+    last one is closed.
+    """
+
+    def __init__(self):
+        self._queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._handlers: set = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, handler: "SupabaseHandler"):
+        """Add a handler, starting the flush thread if it isn't running."""
+        with self._lock:
+            self._handlers.add(handler)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_worker, daemon=True)
+                self._thread.start()
+
+    def unregister(self, handler: "SupabaseHandler"):
+        """Remove a handler; the flush thread stops after the last one."""
+        with self._lock:
+            self._handlers.discard(handler)
+
+    def put(self, supabase_client, log_entry: dict):
+        """Queue a formatted log entry for the given Supabase client."""
+        self._queue.put((supabase_client, log_entry))
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def _flush_worker(self):
+        """Background thread that flushes logs periodically."""
+        while True:
+            with self._lock:
+                if not self._handlers:
+                    self._thread = None
+                    return
+                flush_interval = min(h.flush_interval for h in self._handlers)
+                max_batch = max(h.batch_size for h in self._handlers) * 2
+            time.sleep(flush_interval)
+            if not self._queue.empty():
+                self.flush(max_batch)
+
+    def flush(self, max_batch: int):
+        """Send up to max_batch queued logs to Supabase."""
+        batches: dict[int, tuple] = {}
+        try:
+            for _ in range(max_batch):  # Don't flush too many at once
+                try:
+                    supabase_client, log_entry = self._queue.get_nowait()
+                except Empty:
+                    break
+                if supabase_client:
+                    batch = batches.setdefault(id(supabase_client), (supabase_client, []))
+                    batch[1].append(log_entry)
+
+            for supabase_client, logs in batches.values():
+                supabase_client.table("logs").insert(logs).execute()
+
+        except Exception as e:
+            # Log to stderr if Supabase fails (avoid recursion)
+            print(f"[WARNING] Failed to send logs to Supabase: {e}", file=sys.stderr)
+
+
+_dispatcher = _SupabaseDispatcher()
+
+
 class SupabaseHandler(logging.Handler):
     """Logging handler that batches logs and sends to Supabase.
 
     Logs are buffered and sent in batches to reduce database writes.
     Flush occurs every flush_interval seconds or when batch_size is reached.
+    Records are always formatted with a JSONFormatter for this robot/user.
+    All handlers share one queue and background thread (_SupabaseDispatcher).
     """
 
     def __init__(
@@ -130,11 +242,9 @@ class SupabaseHandler(logging.Handler):
         self.user_id = user_id
         self.batch_size = batch_size
         self.flush_interval = flush_interval
+        self.setFormatter(JSONFormatter(robot_name, user_id))
 
-        self._queue: Queue = Queue()
-        self._shutdown = threading.Event()
-        self._flush_thread = threading.Thread(target=self._flush_worker, daemon=True)
-        self._flush_thread.start()
+        _dispatcher.register(self)
 
         # Register cleanup on exit
         atexit.register(self.close)
@@ -142,56 +252,22 @@ class SupabaseHandler(logging.Handler):
     def emit(self, record: logging.LogRecord):
         """Queue a log record for batched sending."""
         try:
-            # Format the record
-            if isinstance(self.formatter, JSONFormatter):
-                log_entry = self.formatter.format(record)
-            else:
-                log_entry = {
-                    "robot_name": self.robot_name,
-                    "user_id": self.user_id,
-                    "level": record.levelname,
-                    "tag": None,
-                    "message": record.getMessage(),
-                    "module": record.module,
-                    "extra": {}
-                }
-
-            self._queue.put(log_entry)
+            _dispatcher.put(self.supabase, self.formatter.format(record))
 
             # Flush immediately if batch size reached
-            if self._queue.qsize() >= self.batch_size:
+            if _dispatcher.qsize() >= self.batch_size:
                 self._flush()
 
         except Exception:
             self.handleError(record)
 
-    def _flush_worker(self):
-        """Background thread that flushes logs periodically."""
-        while not self._shutdown.is_set():
-            time.sleep(self.flush_interval)
-            if not self._queue.empty():
-                self._flush()
-
     def _flush(self):
         """Send queued logs to Supabase."""
-        logs = []
-        try:
-            while len(logs) < self.batch_size * 2:  # Don't flush too many at once
-                try:
-                    logs.append(self._queue.get_nowait())
-                except Empty:
-                    break
-
-            if logs and self.supabase:
-                self.supabase.table("logs").insert(logs).execute()
-
-        except Exception as e:
-            # Log to stderr if Supabase fails (avoid recursion)
-            print(f"[WARNING] Failed to send logs to Supabase: {e}", file=sys.stderr)
+        _dispatcher.flush(self.batch_size * 2)
 
     def close(self):
-        """Flush remaining logs and stop the background thread."""
-        self._shutdown.set()
+        """Flush remaining logs and release the shared background thread."""
+        _dispatcher.unregister(self)
         self._flush()  # Final flush
         super().close()
 
@@ -247,7 +323,6 @@ def setup_logging(
                 flush_interval=10.0,
             )
             _supabase_handler.setLevel(logging.INFO)
-            _supabase_handler.setFormatter(JSONFormatter(robot_name, user_id))
             _supabase_handler.addFilter(SupabaseFilter())
             root_logger.addHandler(_supabase_handler)
             supabase_enabled = True
@@ -261,7 +336,7 @@ def setup_logging(
     # Log startup info
     logger = logging.getLogger(__name__)
     if supabase_enabled:
-        logger.info(f"[STARTUP] Supabase logging enabled for robot: {robot_name}")
+        logger.info("[STARTUP] Supabase logging enabled for robot: %s", robot_name)
     else:
         logger.info("[STARTUP] Supabase logging disabled (no client)")
 
@@ -11,29 +11,27 @@ It handles:
 MCP clients (ChatGPT, Claude, etc.) connect directly to this server
 via Cloudflare tunnel. Railway is NOT involved in MCP traffic.
 """
+import asyncio
 import os
 import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
 from importlib.metadata import version as get_version
-from pathlib import Path
 
-from dotenv import load_dotenv
+import orjson
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware import Middleware
-from supabase import create_client, Client
 
-from config import load_config
+from config import load_config, load_environment
+from responses import ORJSONResponse
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Load environment: .env (local override) or .env.public (bundled defaults)
-_env_file = Path(".env")
-if _env_file.exists():
-    load_dotenv(_env_file)
-else:
-    # Load bundled .env.public from package directory
-    _package_dir = Path(__file__).parent
-    _public_env = _package_dir / ".env.public"
-    if _public_env.exists():
-        load_dotenv(_public_env)
+load_environment()
 
 # Version from pyproject.toml (single source of truth)
 try:
@@ -54,8 +52,10 @@ MCP_PORT = int(os.getenv("MCP_PORT", "8766"))
 ENABLE_OAUTH = os.getenv("ENABLE_OAUTH", "true").lower() == "true"
 
 # Initialize Supabase client
-supabase: Client = None
+# Imported only when configured: supabase's dependency tree adds noticeably to startup
+supabase: "Client" = None
 if SUPABASE_URL and SUPABASE_ANON_KEY:
+    from supabase import create_client
     supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
 
 # Load local config (needed for robot_name and user_id in logging)
@@ -83,7 +83,7 @@ logger.info(f"[STARTUP] OAuth enabled: {ENABLE_OAUTH}")
 from tools import mcp
 
 # ============== OAuth Authentication Middleware for MCP ==============
-from oauth.middleware import MCPOAuthMiddleware
+from oauth.middleware import MCPOAuthMiddleware, close_http_client
 
 # ============== Streamable HTTP MCP App ==============
 # Create FastMCP app with OAuth middleware BEFORE FastAPI app
@@ -99,13 +99,38 @@ mcp_http_app = mcp.http_app(
     middleware=[Middleware(MCPOAuthMiddleware)] if ENABLE_OAUTH else []
 )
 
+# ============== Lifespan ==============
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the MCP app's lifespan plus background maintenance tasks."""
+    # MCP app's lifespan is required for FastMCP task group initialization
+    async with mcp_http_app.lifespan(app):
+        background_tasks = []
+        if ENABLE_OAUTH:
+            from oauth.stores import run_expiry_reaper
+            background_tasks.append(asyncio.create_task(run_expiry_reaper()))
+        try:
+            yield
+        finally:
+            for task in background_tasks:
+                task.cancel()
+            # Shared-access checks (middleware and SSE) keep a pooled client open
+            await close_http_client()
+
+
 # ============== FastAPI App ==============
-# Pass MCP app's lifespan to FastAPI for proper initialization
+# Pass combined lifespan to FastAPI for proper initialization
 app = FastAPI(
     title="Simple MCP Server",
     description="A minimal MCP server with echo functionality and OAuth 2.1",
     version=VERSION,
-    lifespan=mcp_http_app.lifespan,  # Required for FastMCP task group initialization
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+    # Clients are MCP clients, not people: no Swagger/ReDoc pages or OpenAPI schema
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
 )
 
 # Add CORS middleware for browser-based MCP client access
@@ -124,50 +149,58 @@ app.mount("/mcp", mcp_http_app)
 
 # OAuth endpoints (optional)
 if ENABLE_OAUTH:
-    from oauth.endpoints import router as oauth_router, init_oauth_routes
+    from oauth.endpoints import router as oauth_router, init_oauth_routes, InvalidSessionError, invalid_session_handler
     init_oauth_routes(SERVER_URL, supabase)
     app.include_router(oauth_router)
+    app.add_exception_handler(InvalidSessionError, invalid_session_handler)
 
 # Legacy SSE endpoints
-from sse import router as sse_router, init_sse_routes
+from sse import router as sse_router, init_sse_routes, SSEAuthError, sse_auth_error_handler
 init_sse_routes(SERVER_URL, local_config, mcp)
 app.include_router(sse_router)
+app.add_exception_handler(SSEAuthError, sse_auth_error_handler)
 
 # Note: CLI login endpoints moved to robotmcp_cloud service
 
 
 # ============== Server Info Endpoints ==============
+# Both bodies are fixed once the config is loaded, so encode them once
+
+_health_body = orjson.dumps({"status": "healthy", "service": "mcp-server", "transport": MCP_TRANSPORT})
+
+_root_info = {
+    "name": "Simple MCP Server",
+    "version": VERSION,
+    "transport": MCP_TRANSPORT,
+    "endpoints": {
+        "streamable_http": "/mcp",
+        "sse": "/sse",
+    },
+    "client_compatibility": {
+        "recommended": "/mcp",
+        "fallback": "/sse (use if /mcp doesn't work)",
+    },
+    "tools": ["echo", "ping"],
+    "oauth_enabled": ENABLE_OAUTH
+}
+if ENABLE_OAUTH:
+    _root_info["oauth"] = {
+        "protected_resource": f"{SERVER_URL}/.well-known/oauth-protected-resource",
+        "authorization_server": f"{SERVER_URL}/.well-known/oauth-authorization-server"
+    }
+_root_body = orjson.dumps(_root_info)
+
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Railway."""
-    return {"status": "healthy", "service": "mcp-server", "transport": MCP_TRANSPORT}
+    return Response(content=_health_body, media_type="application/json")
 
 
 @app.get("/")
 async def root():
     """Root endpoint with server info."""
-    response = {
-        "name": "Simple MCP Server",
-        "version": VERSION,
-        "transport": MCP_TRANSPORT,
-        "endpoints": {
-            "streamable_http": "/mcp",
-            "sse": "/sse",
-        },
-        "client_compatibility": {
-            "recommended": "/mcp",
-            "fallback": "/sse (use if /mcp doesn't work)",
-        },
-        "tools": ["echo", "ping"],
-        "oauth_enabled": ENABLE_OAUTH
-    }
-    if ENABLE_OAUTH:
-        response["oauth"] = {
-            "protected_resource": f"{SERVER_URL}/.well-known/oauth-protected-resource",
-            "authorization_server": f"{SERVER_URL}/.well-known/oauth-authorization-server"
-        }
-    return response
+    return Response(content=_root_body, media_type="application/json")
 
 
 # ============== Main Entry Point ==============
@@ -177,4 +210,6 @@ if __name__ == "__main__":
     logger.info(f"Starting MCP server with transport: {MCP_TRANSPORT}")
     logger.info(f"Streamable HTTP endpoint: /mcp")
     logger.info(f"Legacy SSE endpoint: /sse")
-    uvicorn.run(app, host=MCP_HOST, port=MCP_PORT)
+    # uvicorn[standard] already selects uvloop/httptools where available.
+    # Per-request access log lines and the Server header are pure overhead here.
+    uvicorn.run(app, host=MCP_HOST, port=MCP_PORT, access_log=False, server_header=False)
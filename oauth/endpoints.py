@@ -9,15 +9,27 @@ This module contains all OAuth-related endpoints:
 
 import secrets
 import hashlib
+import hmac
+import html
 import base64
+import ssl
 import time
 import logging
+from typing import Optional
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, Request, Form
-from fastapi.responses import JSONResponse, RedirectResponse, HTMLResponse
+import orjson
+from fastapi import APIRouter, Depends, Request, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse, HTMLResponse, Response
 
 from oauth.stores import (
+    PendingAuthorization,
+    AuthorizationCode,
+    RegisteredClient,
+    AuthenticatedUser,
     registered_clients,
+    REGISTERED_CLIENTS_MAXSIZE,
     authorization_codes,
     pending_authorizations,
     authenticated_sessions,
@@ -29,6 +41,7 @@ from oauth.jwt_utils import (
     ACCESS_TOKEN_EXPIRE_SECONDS,
 )
 from oauth.templates import LOGIN_PAGE, SIGNUP_PAGE, CONSENT_PAGE
+from responses import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -38,57 +51,179 @@ router = APIRouter(tags=["oauth"])
 # These will be set by init_oauth_routes()
 _server_url: str = ""
 _supabase = None
+_protected_resource_metadata: bytes = b""
+_authorization_server_metadata: bytes = b""
+_protected_resource_headers: dict = {}
+_authorization_server_headers: dict = {}
+
+# Discovery metadata only changes on restart; let clients cache it and
+# revalidate with If-None-Match
+_METADATA_CACHE_CONTROL = "public, max-age=3600"
+
+# Redirects carry session ids or authorization codes, and token responses carry
+# tokens; none of them may be cached (RFC 6749 section 5.1)
+_NO_STORE_HEADERS = {"Cache-Control": "no-store", "Pragma": "no-cache"}
+
+# Signup password policy (Supabase's default minimum)
+MIN_PASSWORD_LENGTH = 6
+
+# Static page fragments; anything user- or Supabase-supplied goes through html.escape
+_INVALID_SESSION_HTML = "<h1>Invalid or expired session</h1>"
+_REGISTERED_HTML = '<div class="success">Account created successfully! Please sign in.</div>'
+_INVALID_CREDENTIALS_HTML = '<div class="error">Invalid email or password</div>'
+_PASSWORD_MISMATCH_HTML = '<div class="error">Passwords do not match</div>'
+_PASSWORD_TOO_SHORT_HTML = f'<div class="error">Password must be at least {MIN_PASSWORD_LENGTH} characters</div>'
+_SIGNUP_FAILED_HTML = '<div class="error">Failed to create account</div>'
+_EMAIL_EXISTS_HTML = '<div class="error">An account with this email already exists</div>'
+
+# Characters allowed in a base64url code_challenge (RFC 7636 appendix A)
+_BASE64URL_ALPHABET = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_")
+
+# Error query for a denied consent, minus the client's state
+_ACCESS_DENIED_QUERY = urlencode({"error": "access_denied", "error_description": "User denied access"})
+
+
+def _sha256_uses_openssl() -> bool:
+    """Return True if hashlib.sha256 is OpenSSL's implementation."""
+    try:
+        import _hashlib
+    except ImportError:
+        return False
+    return hashlib.sha256 is getattr(_hashlib, "openssl_sha256", None)
 
 
 def init_oauth_routes(server_url: str, supabase_client):
     """Initialize OAuth routes with server URL and Supabase client.
 
     Must be called before including the router in the app.
+    The discovery metadata is serialized here since it only depends on server_url.
     """
     global _server_url, _supabase
+    global _protected_resource_metadata, _authorization_server_metadata
+    global _protected_resource_headers, _authorization_server_headers
     _server_url = server_url
     _supabase = supabase_client
 
-
-# ============== OAuth 2.1 Discovery Endpoints ==============
-
-@router.get("/.well-known/oauth-protected-resource")
-async def oauth_protected_resource():
-    """OAuth 2.0 Protected Resource Metadata (RFC 9728)."""
-    return {
-        "resource": _server_url,
-        "authorization_servers": [_server_url],
+    # PKCE verification hashes with SHA-256 on every code exchange; flag builds
+    # where hashlib fell back to its slower built-in implementation
+    if _sha256_uses_openssl():
+        logger.info("[STARTUP] PKCE hashing uses OpenSSL SHA-256 (%s)", ssl.OPENSSL_VERSION)
+    else:
+        logger.warning("[STARTUP] hashlib.sha256 is not OpenSSL-backed; PKCE hashing uses the slower built-in implementation")
+
+    # OAuth 2.0 Protected Resource Metadata (RFC 9728)
+    _protected_resource_metadata = orjson.dumps({
+        "resource": server_url,
+        "authorization_servers": [server_url],
         "scopes_supported": ["mcp:tools", "mcp:read"],
         "bearer_methods_supported": ["header"],
-        "resource_documentation": f"{_server_url}/docs"
-    }
-
-
-@router.get("/.well-known/oauth-authorization-server")
-async def oauth_authorization_server():
-    """OAuth 2.0 Authorization Server Metadata (RFC 8414)."""
-    return {
-        "issuer": _server_url,
-        "authorization_endpoint": f"{_server_url}/authorize",
-        "token_endpoint": f"{_server_url}/token",
-        "registration_endpoint": f"{_server_url}/register",
+    })
+
+    # OAuth 2.0 Authorization Server Metadata (RFC 8414)
+    _authorization_server_metadata = orjson.dumps({
+        "issuer": server_url,
+        "authorization_endpoint": f"{server_url}/authorize",
+        "token_endpoint": f"{server_url}/token",
+        "registration_endpoint": f"{server_url}/register",
         "scopes_supported": ["mcp:tools", "mcp:read"],
         "response_types_supported": ["code"],
         "response_modes_supported": ["query"],
         "grant_types_supported": ["authorization_code", "refresh_token"],
         "token_endpoint_auth_methods_supported": ["none", "client_secret_post"],
         "code_challenge_methods_supported": ["S256"],
-        "service_documentation": f"{_server_url}/docs"
+    })
+
+    _protected_resource_headers = _metadata_headers(_protected_resource_metadata)
+    _authorization_server_headers = _metadata_headers(_authorization_server_metadata)
+
+
+def _metadata_headers(body: bytes) -> dict:
+    """Caching headers for a discovery document, with an ETag derived from its body."""
+    return {
+        "Cache-Control": _METADATA_CACHE_CONTROL,
+        "ETag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
     }
 
 
+def _metadata_response(request: Request, body: bytes, headers: dict) -> Response:
+    """Serve a discovery document, or 304 if the client's cached copy is current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = headers["ETag"]
+        # Weak comparison (RFC 9110 section 13.1.2): ignore any W/ prefix
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == etag:
+                return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _decode_code_challenge(code_challenge: str) -> Optional[bytes]:
+    """Decode an S256 code_challenge to its raw SHA-256 digest.
+
+    A valid challenge is 43 base64url characters without padding (RFC 7636).
+    Returns None if it isn't one.
+    """
+    # urlsafe_b64decode also takes "+" and "/" and ignores stray trailing
+    # bits, so check the alphabet first and the round trip after
+    if len(code_challenge) != 43 or not _BASE64URL_ALPHABET.issuperset(code_challenge):
+        return None
+    digest = base64.urlsafe_b64decode(code_challenge + "=")
+    if base64.urlsafe_b64encode(digest)[:43] != code_challenge.encode("ascii"):
+        return None
+    return digest
+
+
+class InvalidSessionError(Exception):
+    """Raised by the session dependencies for an unknown or expired login session.
+
+    Rendered by invalid_session_handler, which main.py registers on the app.
+    """
+
+
+async def invalid_session_handler(request: Request, exc: InvalidSessionError) -> HTMLResponse:
+    """Exception handler turning InvalidSessionError into the 400 error page."""
+    return HTMLResponse(_INVALID_SESSION_HTML, status_code=400)
+
+
+def _get_pending(session: str) -> PendingAuthorization:
+    auth_data = pending_authorizations.get(session) if session else None
+    if auth_data is None:
+        raise InvalidSessionError()
+    return auth_data
+
+
+async def pending_from_query(session: str = "") -> PendingAuthorization:
+    """FastAPI dependency: the pending authorization for the ?session= query parameter."""
+    return _get_pending(session)
+
+
+async def pending_from_form(session: str = Form(...)) -> PendingAuthorization:
+    """FastAPI dependency: the pending authorization for the posted session field."""
+    return _get_pending(session)
+
+
+# ============== OAuth 2.1 Discovery Endpoints ==============
+
+@router.get("/.well-known/oauth-protected-resource")
+async def oauth_protected_resource(request: Request):
+    """OAuth 2.0 Protected Resource Metadata (RFC 9728)."""
+    return _metadata_response(request, _protected_resource_metadata, _protected_resource_headers)
+
+
+@router.get("/.well-known/oauth-authorization-server")
+async def oauth_authorization_server(request: Request):
+    """OAuth 2.0 Authorization Server Metadata (RFC 8414)."""
+    return _metadata_response(request, _authorization_server_metadata, _authorization_server_headers)
+
+
 # ============== Client Registration ==============
 
 @router.post("/register")
 async def register_client(request: Request):
     """OAuth 2.0 Dynamic Client Registration (RFC 7591)."""
     try:
-        data = await request.json()
+        data = orjson.loads(await request.body())
     except:
         data = {}
 
@@ -96,28 +231,33 @@ async def register_client(request: Request):
     client_secret = secrets.token_urlsafe(32)
     logger.info(f"[REGISTER] Client registration request: {data.get('client_name', 'MCP Client')}")
 
-    client_info = {
-        "client_id": client_id,
-        "client_secret": client_secret,
-        "client_name": data.get("client_name", "MCP Client"),
-        "redirect_uris": data.get("redirect_uris", ["https://chatgpt.com/connector_platform_oauth_redirect"]),
-        "grant_types": data.get("grant_types", ["authorization_code", "refresh_token"]),
-        "response_types": data.get("response_types", ["code"]),
-        "token_endpoint_auth_method": data.get("token_endpoint_auth_method", "none"),
-        "created_at": int(time.time())
-    }
+    client_info = RegisteredClient(
+        client_id=client_id,
+        client_secret=client_secret,
+        client_name=data.get("client_name", "MCP Client"),
+        redirect_uris=data.get("redirect_uris", ["https://chatgpt.com/connector_platform_oauth_redirect"]),
+        grant_types=data.get("grant_types", ["authorization_code", "refresh_token"]),
+        response_types=data.get("response_types", ["code"]),
+        token_endpoint_auth_method=data.get("token_endpoint_auth_method", "none"),
+        created_at=int(time.time())
+    )
 
     registered_clients[client_id] = client_info
+    if len(registered_clients) > REGISTERED_CLIENTS_MAXSIZE:
+        # Dicts keep insertion order, so the first key is the oldest registration.
+        # Grants already issued to an evicted confidential client stay bound to
+        # its secret (client_secret_required), so eviction can't waive it.
+        del registered_clients[next(iter(registered_clients))]
     logger.info(f"[REGISTER] Client registered: {client_id[:8]}...")
 
-    return JSONResponse({
+    return ORJSONResponse({
         "client_id": client_id,
         "client_secret": client_secret,
-        "client_name": client_info["client_name"],
-        "redirect_uris": client_info["redirect_uris"],
-        "grant_types": client_info["grant_types"],
-        "response_types": client_info["response_types"],
-        "token_endpoint_auth_method": client_info["token_endpoint_auth_method"]
+        "client_name": client_info.client_name,
+        "redirect_uris": client_info.redirect_uris,
+        "grant_types": client_info.grant_types,
+        "response_types": client_info.response_types,
+        "token_endpoint_auth_method": client_info.token_endpoint_auth_method
     }, status_code=201)
 
 
@@ -137,105 +277,104 @@ async def authorize(
     """OAuth 2.0 Authorization Endpoint - redirects to login."""
     logger.info(f"[AUTHORIZE] Authorization request: client_id={client_id[:8] if client_id else 'none'}..., scope={scope}")
     if response_type != "code":
-        return JSONResponse({"error": "unsupported_response_type"}, status_code=400)
+        return ORJSONResponse({"error": "unsupported_response_type"}, status_code=400)
+
+    # Only S256 is supported (and advertised); a plain challenge would
+    # otherwise be taken for a digest and fail confusingly at /token
+    if code_challenge_method != "S256":
+        logger.info("[AUTHORIZE] Authorization request rejected: unsupported code_challenge_method")
+        return ORJSONResponse({"error": "invalid_request", "error_description": "Unsupported code_challenge_method"}, status_code=400)
+
+    # Decode the PKCE challenge once; /token compares raw digests
+    code_challenge_digest = b""
+    if code_challenge:
+        code_challenge_digest = _decode_code_challenge(code_challenge)
+        if code_challenge_digest is None:
+            logger.info("[AUTHORIZE] Authorization request rejected: malformed code_challenge")
+            return ORJSONResponse({"error": "invalid_request", "error_description": "Invalid code_challenge"}, status_code=400)
+
+    # Record now whether the client must authenticate at /token, so a
+    # registration evicted in between can't waive its secret
+    client = registered_clients.get(client_id)
+    client_secret_required = client is not None and client.token_endpoint_auth_method == "client_secret_post"
+
+    # Encode state once; both consent outcomes append it to the redirect
+    state_query = f"&{urlencode({'state': state})}" if state else ""
 
     # Generate session ID and store OAuth params
     session_id = secrets.token_urlsafe(32)
-    pending_authorizations[session_id] = {
-        "client_id": client_id,
-        "redirect_uri": redirect_uri,
-        "scope": scope,
-        "state": state,
-        "code_challenge": code_challenge,
-        "code_challenge_method": code_challenge_method,
-        "created_at": int(time.time()),
-        "expires_at": int(time.time()) + 600  # 10 minutes
-    }
+    pending_authorizations[session_id] = PendingAuthorization(
+        client_id=client_id,
+        redirect_uri=redirect_uri,
+        scope=scope,
+        state_query=state_query,
+        code_challenge_digest=code_challenge_digest,
+        code_challenge_method=code_challenge_method,
+        client_secret_required=client_secret_required,
+    )
     logger.info(f"[AUTHORIZE] Session created: {session_id[:8]}..., redirecting to login")
 
     # Redirect to login page
-    return RedirectResponse(url=f"/login?session={session_id}", status_code=302)
+    return RedirectResponse(url=f"/login?session={session_id}", status_code=302, headers=_NO_STORE_HEADERS)
 
 
-@router.get("/login")
+@router.get("/login", dependencies=[Depends(pending_from_query)])
 async def login_page(session: str = "", registered: str = ""):
     """Show login form."""
-    logger.info(f"[LOGIN] Login page requested: session={session[:8] if session else 'none'}...")
-    if not session or session not in pending_authorizations:
-        return HTMLResponse("<h1>Invalid or expired session</h1>", status_code=400)
-
-    # Check if session expired
-    auth_data = pending_authorizations[session]
-    if time.time() > auth_data["expires_at"]:
-        del pending_authorizations[session]
-        return HTMLResponse("<h1>Session expired. Please try again.</h1>", status_code=400)
-
+    logger.info(f"[LOGIN] Login page requested: session={session[:8]}...")
     # Show success message if user just registered
     success_msg = ""
     if registered == "1":
-        success_msg = '<div class="success">Account created successfully! Please sign in.</div>'
+        success_msg = _REGISTERED_HTML
 
-    return HTMLResponse(LOGIN_PAGE.format(session=session, error="", success=success_msg))
+    return HTMLResponse(LOGIN_PAGE.render(session=session, error="", success=success_msg))
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(pending_from_form)])
 async def login_submit(
     session: str = Form(...),
     email: str = Form(...),
     password: str = Form(...)
 ):
     """Handle login form submission."""
-    if not session or session not in pending_authorizations:
-        return HTMLResponse("<h1>Invalid or expired session</h1>", status_code=400)
-
-    auth_data = pending_authorizations[session]
-    if time.time() > auth_data["expires_at"]:
-        del pending_authorizations[session]
-        return HTMLResponse("<h1>Session expired. Please try again.</h1>", status_code=400)
-
     # Authenticate with Supabase
     if not _supabase:
         # Fallback: accept any login if Supabase not configured
-        authenticated_sessions[session] = {"email": email, "user_id": "demo-user"}
-        return RedirectResponse(url=f"/consent?session={session}", status_code=302)
+        authenticated_sessions[session] = AuthenticatedUser(email=email, user_id="demo-user")
+        return RedirectResponse(url=f"/consent?session={session}", status_code=302, headers=_NO_STORE_HEADERS)
+
+    # Input that can't match any account never needs a Supabase round trip
+    if not password or "@" not in email:
+        logger.info("[LOGIN] Login failed: malformed credentials for session %s...", session[:8])
+        return HTMLResponse(LOGIN_PAGE.render(session=session, error=_INVALID_CREDENTIALS_HTML, success=""))
 
     try:
-        response = _supabase.auth.sign_in_with_password({
+        # supabase-py is synchronous; keep the network round trip off the event loop
+        response = await run_in_threadpool(_supabase.auth.sign_in_with_password, {
             "email": email,
             "password": password
         })
 
-        if response.user:
-            logger.info(f"[LOGIN] User authenticated: {response.user.email}")
-            authenticated_sessions[session] = {
-                "email": response.user.email,
-                "user_id": response.user.id
-            }
-            return RedirectResponse(url=f"/consent?session={session}", status_code=302)
+        user = response.user
+        if user:
+            user_email = user.email
+            logger.info(f"[LOGIN] User authenticated: {user_email}")
+            authenticated_sessions[session] = AuthenticatedUser(email=user_email, user_id=user.id)
+            return RedirectResponse(url=f"/consent?session={session}", status_code=302, headers=_NO_STORE_HEADERS)
         else:
             logger.info(f"[LOGIN] Login failed: invalid credentials for session {session[:8]}...")
-            error_html = '<div class="error">Invalid email or password</div>'
-            return HTMLResponse(LOGIN_PAGE.format(session=session, error=error_html, success=""))
+            return HTMLResponse(LOGIN_PAGE.render(session=session, error=_INVALID_CREDENTIALS_HTML, success=""))
     except Exception as e:
         logger.info(f"[LOGIN] Login failed: authentication error for session {session[:8]}...")
-        error_html = f'<div class="error">Authentication failed: {str(e)}</div>'
-        return HTMLResponse(LOGIN_PAGE.format(session=session, error=error_html, success=""))
+        error_html = f'<div class="error">Authentication failed: {html.escape(str(e))}</div>'
+        return HTMLResponse(LOGIN_PAGE.render(session=session, error=error_html, success=""))
 
 
-@router.get("/signup")
+@router.get("/signup", dependencies=[Depends(pending_from_query)])
 async def signup_page(session: str = ""):
     """Show signup form."""
-    logger.info(f"[SIGNUP] Signup page requested: session={session[:8] if session else 'none'}...")
-    if not session or session not in pending_authorizations:
-        return HTMLResponse("<h1>Invalid or expired session</h1>", status_code=400)
-
-    # Check if session expired
-    auth_data = pending_authorizations[session]
-    if time.time() > auth_data["expires_at"]:
-        del pending_authorizations[session]
-        return HTMLResponse("<h1>Session expired. Please try again.</h1>", status_code=400)
-
-    return HTMLResponse(SIGNUP_PAGE.format(session=session, error=""))
+    logger.info(f"[SIGNUP] Signup page requested: session={session[:8]}...")
+    return HTMLResponse(SIGNUP_PAGE.render(session=session, error=""))
 
 
 @router.post("/signup")
@@ -246,131 +385,138 @@ async def signup_submit(
     confirm_password: str = Form(...)
 ):
     """Handle signup form submission."""
-    if not session or session not in pending_authorizations:
-        return HTMLResponse("<h1>Invalid or expired session</h1>", status_code=400)
-
-    auth_data = pending_authorizations[session]
-    if time.time() > auth_data["expires_at"]:
-        del pending_authorizations[session]
-        return HTMLResponse("<h1>Session expired. Please try again.</h1>", status_code=400)
-
+    # Cheap form checks first, so bad submissions never reach the stores or Supabase.
+    # The session isn't validated yet, so it is escaped before being echoed back.
     # Validate passwords match
     if password != confirm_password:
-        error_html = '<div class="error">Passwords do not match</div>'
-        return HTMLResponse(SIGNUP_PAGE.format(session=session, error=error_html))
+        return HTMLResponse(SIGNUP_PAGE.render(session=html.escape(session), error=_PASSWORD_MISMATCH_HTML))
 
     # Validate password length
-    if len(password) < 6:
-        error_html = '<div class="error">Password must be at least 6 characters</div>'
-        return HTMLResponse(SIGNUP_PAGE.format(session=session, error=error_html))
+    if len(password) < MIN_PASSWORD_LENGTH:
+        return HTMLResponse(SIGNUP_PAGE.render(session=html.escape(session), error=_PASSWORD_TOO_SHORT_HTML))
+
+    # Raises InvalidSessionError (400 page) for an unknown or expired session
+    _get_pending(session)
 
     # Create account with Supabase
     if not _supabase:
         # Fallback: just redirect to login if Supabase not configured
-        return RedirectResponse(url=f"/login?session={session}&registered=1", status_code=302)
+        return RedirectResponse(url=f"/login?session={session}&registered=1", status_code=302, headers=_NO_STORE_HEADERS)
 
     try:
-        response = _supabase.auth.sign_up({
+        response = await run_in_threadpool(_supabase.auth.sign_up, {
             "email": email,
             "password": password
         })
 
         if response.user:
             logger.info(f"[SIGNUP] Account created: {email}")
-            return RedirectResponse(url=f"/login?session={session}&registered=1", status_code=302)
+            return RedirectResponse(url=f"/login?session={session}&registered=1", status_code=302, headers=_NO_STORE_HEADERS)
         else:
             logger.info(f"[SIGNUP] Account creation failed for session: {session[:8]}...")
-            error_html = '<div class="error">Failed to create account</div>'
-            return HTMLResponse(SIGNUP_PAGE.format(session=session, error=error_html))
+            return HTMLResponse(SIGNUP_PAGE.render(session=session, error=_SIGNUP_FAILED_HTML))
     except Exception as e:
         error_msg = str(e)
         if "already registered" in error_msg.lower():
             logger.info(f"[SIGNUP] Signup failed: email already exists for session: {session[:8]}...")
-            error_html = '<div class="error">An account with this email already exists</div>'
+            error_html = _EMAIL_EXISTS_HTML
         else:
             logger.info(f"[SIGNUP] Signup failed: {error_msg[:50]} for session: {session[:8]}...")
-            error_html = f'<div class="error">Signup failed: {error_msg}</div>'
-        return HTMLResponse(SIGNUP_PAGE.format(session=session, error=error_html))
+            error_html = f'<div class="error">Signup failed: {html.escape(error_msg)}</div>'
+        return HTMLResponse(SIGNUP_PAGE.render(session=session, error=error_html))
 
 
 # ============== Consent ==============
 
-@router.get("/consent")
+@router.get("/consent", dependencies=[Depends(pending_from_query)])
 async def consent_page(session: str = ""):
     """Show consent/authorization page."""
-    if not session or session not in pending_authorizations:
-        return HTMLResponse("<h1>Invalid or expired session</h1>", status_code=400)
-
     if session not in authenticated_sessions:
-        return RedirectResponse(url=f"/login?session={session}", status_code=302)
+        return RedirectResponse(url=f"/login?session={session}", status_code=302, headers=_NO_STORE_HEADERS)
 
     user_info = authenticated_sessions[session]
-    logger.info(f"[CONSENT] Consent page shown to user: {user_info.get('email')}")
-    return HTMLResponse(CONSENT_PAGE.format(
+    logger.info(f"[CONSENT] Consent page shown to user: {user_info.email}")
+    return HTMLResponse(CONSENT_PAGE.render(
         session=session,
-        user_email=user_info.get("email", "Unknown")
+        user_email=html.escape(user_info.email or "Unknown")
     ))
 
 
 @router.post("/consent")
 async def consent_submit(
     session: str = Form(...),
-    action: str = Form(...)
+    action: str = Form(...),
+    auth_data: PendingAuthorization = Depends(pending_from_form)
 ):
     """Handle consent form submission."""
-    from urllib.parse import urlencode
-
-    if not session or session not in pending_authorizations:
-        return HTMLResponse("<h1>Invalid or expired session</h1>", status_code=400)
-
-    auth_data = pending_authorizations[session]
-    redirect_uri = auth_data["redirect_uri"]
-    state = auth_data.get("state", "")
+    redirect_uri = auth_data.redirect_uri
+    # Append to a query the client registered in its redirect_uri (RFC 6749 section 3.1.2)
+    query_sep = "&" if "?" in redirect_uri else "?"
 
     if action == "deny":
         # User denied access
         logger.info(f"[CONSENT] User denied access for session: {session[:8]}...")
-        del pending_authorizations[session]
-        if session in authenticated_sessions:
-            del authenticated_sessions[session]
+        pending_authorizations.pop(session, None)
+        authenticated_sessions.pop(session, None)
 
-        params = {"error": "access_denied", "error_description": "User denied access"}
-        if state:
-            params["state"] = state
-        return RedirectResponse(url=f"{redirect_uri}?{urlencode(params)}", status_code=302)
+        return RedirectResponse(
+            url=f"{redirect_uri}{query_sep}{_ACCESS_DENIED_QUERY}{auth_data.state_query}",
+            status_code=302,
+            headers=_NO_STORE_HEADERS,
+        )
 
     # User approved - generate authorization code
-    user_info = authenticated_sessions.get(session, {})
-    logger.info(f"[CONSENT] User granted consent: {user_info.get('email')}")
+    # The login session is consumed either way, so take it out while reading it
+    user_info = authenticated_sessions.pop(session, None) or AuthenticatedUser(email=None, user_id=None)
+    logger.info(f"[CONSENT] User granted consent: {user_info.email}")
     auth_code = secrets.token_urlsafe(32)
 
-    authorization_codes[auth_code] = {
-        "client_id": auth_data["client_id"],
-        "redirect_uri": auth_data["redirect_uri"],
-        "scope": auth_data["scope"],
-        "code_challenge": auth_data["code_challenge"],
-        "code_challenge_method": auth_data["code_challenge_method"],
-        "user_id": user_info.get("user_id"),
-        "user_email": user_info.get("email"),
-        "created_at": int(time.time()),
-        "expires_at": int(time.time()) + 600  # 10 minutes
-    }
-    logger.info(f"[CONSENT] Authorization code issued for client: {auth_data['client_id'][:8]}...")
+    authorization_codes[auth_code] = AuthorizationCode(
+        client_id=auth_data.client_id,
+        redirect_uri=auth_data.redirect_uri,
+        scope=auth_data.scope,
+        code_challenge_digest=auth_data.code_challenge_digest,
+        code_challenge_method=auth_data.code_challenge_method,
+        client_secret_required=auth_data.client_secret_required,
+        user_id=user_info.user_id,
+        user_email=user_info.email,
+    )
+    logger.info(f"[CONSENT] Authorization code issued for client: {auth_data.client_id[:8]}...")
 
     # Clean up session data
-    del pending_authorizations[session]
-    if session in authenticated_sessions:
-        del authenticated_sessions[session]
+    pending_authorizations.pop(session, None)
 
     # Redirect back with code
-    params = {"code": auth_code}
-    if state:
-        params["state"] = state
-    return RedirectResponse(url=f"{redirect_uri}?{urlencode(params)}", status_code=302)
+    # auth_code is already URL-safe
+    return RedirectResponse(url=f"{redirect_uri}{query_sep}code={auth_code}{auth_data.state_query}", status_code=302, headers=_NO_STORE_HEADERS)
 
 
 # ============== Token Endpoint ==============
 
+def _client_authenticated(
+    grant_client_id: str,
+    client_secret_required: bool,
+    client_id: Optional[str],
+    client_secret: Optional[str],
+) -> bool:
+    """Check that a token request comes from the client the grant was issued to.
+
+    The request's client_id must match the grant's. If the grant was issued
+    to a client_secret_post client, the request must also carry its secret;
+    when that registration is gone (evicted, or lost on restart) the secret
+    can't be checked, so the request is refused.
+    """
+    if client_id != grant_client_id:
+        return False
+    if not client_secret_required:
+        return True
+    client = registered_clients.get(grant_client_id)
+    if client is None:
+        return False
+    # Constant-time compare so the secret can't be probed byte by byte
+    return hmac.compare_digest(client.client_secret.encode(), (client_secret or "").encode())
+
+
 @router.post("/token")
 async def token(
     request: Request,
@@ -386,7 +532,7 @@ async def token(
     # Handle form data or JSON
     if grant_type is None:
         try:
-            data = await request.json()
+            data = orjson.loads(await request.body())
             grant_type = data.get("grant_type")
             code = data.get("code")
             redirect_uri = data.get("redirect_uri")
@@ -395,43 +541,47 @@ async def token(
             code_verifier = data.get("code_verifier")
             refresh_token = data.get("refresh_token")
         except:
-            return JSONResponse({"error": "invalid_request"}, status_code=400)
+            return ORJSONResponse({"error": "invalid_request"}, status_code=400)
 
     logger.info(f"[TOKEN] Token request: grant_type={grant_type}, client_id={client_id[:8] if client_id else 'none'}...")
 
     if grant_type == "authorization_code":
-        if not code or code not in authorization_codes:
-            logger.info("[TOKEN] Token request failed: invalid authorization code")
-            return JSONResponse({"error": "invalid_grant"}, status_code=400)
-
-        auth_data = authorization_codes[code]
-
-        # Check expiration
-        if time.time() > auth_data["expires_at"]:
-            del authorization_codes[code]
-            logger.info("[TOKEN] Token request failed: authorization code expired")
-            return JSONResponse({"error": "invalid_grant", "error_description": "Code expired"}, status_code=400)
-
-        # Verify PKCE
-        if auth_data.get("code_challenge") and code_verifier:
-            expected = base64.urlsafe_b64encode(
-                hashlib.sha256(code_verifier.encode()).digest()
-            ).rstrip(b"=").decode()
-
-            if expected != auth_data["code_challenge"]:
+        # Codes are single-use: take it out now, so even a failed exchange
+        # consumes it. Expired codes read as missing.
+        auth_data = authorization_codes.pop(code, None) if code else None
+        if auth_data is None:
+            logger.info("[TOKEN] Token request failed: invalid or expired authorization code")
+            return ORJSONResponse({"error": "invalid_grant"}, status_code=400)
+
+        # The code is bound to the client it was issued to
+        if not _client_authenticated(auth_data.client_id, auth_data.client_secret_required, client_id, client_secret):
+            logger.info("[TOKEN] Token request failed: client authentication failed")
+            return ORJSONResponse({"error": "invalid_client"}, status_code=401, headers=_NO_STORE_HEADERS)
+
+        # Verify PKCE: a code issued with a challenge can't be redeemed without the verifier
+        if auth_data.code_challenge_digest:
+            # Verifiers are ASCII by definition (RFC 7636 section 4.1)
+            if not code_verifier or not code_verifier.isascii():
+                logger.info("[TOKEN] Token request failed: missing or malformed PKCE code_verifier")
+                return ORJSONResponse({"error": "invalid_grant", "error_description": "PKCE verification failed"}, status_code=400)
+
+            verifier_digest = hashlib.sha256(code_verifier.encode("ascii")).digest()
+
+            # Constant-time compare so the challenge can't be probed byte by byte
+            if not hmac.compare_digest(verifier_digest, auth_data.code_challenge_digest):
                 logger.info("[TOKEN] Token request failed: PKCE verification failed")
-                return JSONResponse({"error": "invalid_grant", "error_description": "PKCE verification failed"}, status_code=400)
+                return ORJSONResponse({"error": "invalid_grant", "error_description": "PKCE verification failed"}, status_code=400)
 
         # Generate JWT tokens (stateless - no storage needed)
-        user_id = auth_data.get("user_id") or ""
-        user_email = auth_data.get("user_email") or ""
-        scope = auth_data["scope"]
+        user_id = auth_data.user_id or ""
+        user_email = auth_data.user_email or ""
+        scope = auth_data.scope
         expires_in = ACCESS_TOKEN_EXPIRE_SECONDS  # 24 hours
 
         new_access_token = create_access_token(
             user_id=user_id,
             user_email=user_email,
-            client_id=client_id or "",
+            client_id=auth_data.client_id,
             scope=scope,
             issuer=_server_url,
             expires_in=expires_in
@@ -440,23 +590,21 @@ async def token(
         new_refresh_token = create_refresh_token(
             user_id=user_id,
             user_email=user_email,
-            client_id=client_id or "",
+            client_id=auth_data.client_id,
             scope=scope,
-            issuer=_server_url
+            issuer=_server_url,
+            client_secret_required=auth_data.client_secret_required
         )
 
         logger.info(f"[TOKEN] JWT access token created for user: {user_email}")
 
-        # Clean up used code
-        del authorization_codes[code]
-
-        return JSONResponse({
+        return ORJSONResponse({
             "access_token": new_access_token,
             "token_type": "Bearer",
             "expires_in": expires_in,
             "refresh_token": new_refresh_token,
-            "scope": auth_data["scope"]
-        })
+            "scope": auth_data.scope
+        }, headers=_NO_STORE_HEADERS)
 
     elif grant_type == "refresh_token":
         # Verify the refresh token (JWT-based, stateless)
@@ -464,7 +612,14 @@ async def token(
 
         if not token_data:
             logger.info("[TOKEN] Refresh token failed: invalid or expired token")
-            return JSONResponse({"error": "invalid_grant", "error_description": "Invalid or expired refresh token"}, status_code=400)
+            return ORJSONResponse({"error": "invalid_grant", "error_description": "Invalid or expired refresh token"}, status_code=400)
+
+        # Refresh tokens carry the client they were issued to; ones minted
+        # before that binding existed have an empty client_id claim
+        client_secret_required = token_data.get("client_secret_required", False)
+        if token_data.get("client_id") and not _client_authenticated(token_data["client_id"], client_secret_required, client_id, client_secret):
+            logger.info("[TOKEN] Refresh token failed: client authentication failed")
+            return ORJSONResponse({"error": "invalid_client"}, status_code=401, headers=_NO_STORE_HEADERS)
 
         # Extract user info from the verified token
         user_id = token_data.get("sub", "")
@@ -487,17 +642,18 @@ async def token(
             user_email=user_email,
             client_id=client_id or "",
             scope=scope,
-            issuer=_server_url
+            issuer=_server_url,
+            client_secret_required=client_secret_required
         )
 
         logger.info(f"[TOKEN] JWT refresh successful for user: {user_email}, client: {client_id[:8] if client_id else 'none'}...")
 
-        return JSONResponse({
+        return ORJSONResponse({
             "access_token": new_access_token,
             "token_type": "Bearer",
             "expires_in": expires_in,
             "refresh_token": new_refresh_token,
             "scope": scope
-        })
+        }, headers=_NO_STORE_HEADERS)
 
-    return JSONResponse({"error": "unsupported_grant_type"}, status_code=400)
+    return ORJSONResponse({"error": "unsupported_grant_type"}, status_code=400)
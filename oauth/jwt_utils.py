@@ -8,6 +8,8 @@ not by looking up tokens in an in-memory store.
 import os
 import secrets
 import logging
+import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
 import jwt
@@ -23,6 +25,12 @@ REFRESH_TOKEN_EXPIRE_SECONDS = 30 * 24 * 60 * 60  # 30 days
 _jwt_secret: Optional[str] = None
 SECRET_FILE = Path.home() / ".simple-mcp-server" / "jwt_secret"
 
+# Recently verified access tokens: (token, issuer) -> decoded payload.
+# MCP clients reuse one token for many requests, so this skips the HMAC check
+# and JSON decode on repeat hits. Bounded LRU; entries are dropped at "exp".
+ACCESS_TOKEN_CACHE_SIZE = 4096
+_access_token_cache: "OrderedDict[tuple[str, Optional[str]], dict]" = OrderedDict()
+
 
 def _get_or_create_secret() -> str:
     """Get JWT secret from file, or create one if it doesn't exist.
@@ -88,8 +96,6 @@ def create_access_token(
     Returns:
         A signed JWT token string
     """
-    import time
-
     secret = _get_or_create_secret()
     now = int(time.time())
 
@@ -114,7 +120,8 @@ def create_refresh_token(
     client_id: str,
     scope: str,
     issuer: str,
-    expires_in: int = REFRESH_TOKEN_EXPIRE_SECONDS
+    expires_in: int = REFRESH_TOKEN_EXPIRE_SECONDS,
+    client_secret_required: bool = False
 ) -> str:
     """Create a JWT refresh token.
 
@@ -125,12 +132,11 @@ def create_refresh_token(
         scope: The granted OAuth scope
         issuer: The token issuer (server URL)
         expires_in: Token lifetime in seconds (default 30 days)
+        client_secret_required: Whether refreshing needs the client's secret
 
     Returns:
         A signed JWT token string
     """
-    import time
-
     secret = _get_or_create_secret()
     now = int(time.time())
 
@@ -142,7 +148,8 @@ def create_refresh_token(
         "iss": issuer,             # Issuer
         "iat": now,                # Issued at
         "exp": now + expires_in,   # Expiration
-        "type": "refresh"          # Token type
+        "type": "refresh",         # Token type
+        "client_secret_required": client_secret_required,  # client_secret_post client
     }
 
     token = jwt.encode(payload, secret, algorithm=JWT_ALGORITHM)
@@ -160,6 +167,14 @@ def verify_access_token(token: str, issuer: str = None) -> Optional[dict]:
         The decoded token payload if valid, None otherwise.
         The payload contains: sub, email, client_id, scope, iss, iat, exp, type
     """
+    cache_key = (token, issuer)
+    payload = _access_token_cache.get(cache_key)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            _access_token_cache.move_to_end(cache_key)
+            return payload
+        del _access_token_cache[cache_key]
+
     secret = _get_or_create_secret()
 
     try:
@@ -185,6 +200,9 @@ def verify_access_token(token: str, issuer: str = None) -> Optional[dict]:
             logger.debug("[JWT] Token is not an access token")
             return None
 
+        _access_token_cache[cache_key] = payload
+        if len(_access_token_cache) > ACCESS_TOKEN_CACHE_SIZE:
+            _access_token_cache.popitem(last=False)
         return payload
 
     except jwt.ExpiredSignatureError:
@@ -8,19 +8,24 @@ Uses JWT for stateless token validation - tokens survive server restarts.
 
 import logging
 import os
+import time
+from collections import OrderedDict
+from typing import Optional
 
 import httpx
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from config import load_config
 from oauth.jwt_utils import verify_access_token
 
 logger = logging.getLogger(__name__)
 
-# Load config for access check
+# Load config for access check. Only the owner id and robot name are needed
+# per request; bind them once instead of going through Config's properties.
 _config = load_config()
+_creator_user_id = _config.user_id
+_robot_name = _config.robot_name
 
 # Cloud service URL for access checks
 ROBOTMCP_CLOUD_URL = os.getenv("ROBOTMCP_CLOUD_URL", "https://app.robotmcp.ai")
@@ -31,68 +36,207 @@ def get_server_url() -> str:
     return _config.tunnel_url or os.getenv("SERVER_URL", "https://simplemcpserver-production-e610.up.railway.app")
 
 
+# Fixed for the process lifetime, like _config; resolved once instead of per request
+_server_url = get_server_url()
+_www_authenticate = f'Bearer resource_metadata="{_server_url}/.well-known/oauth-protected-resource"'.encode()
+
+# The 401/403 replies never vary, so their bodies are encoded once and sent
+# straight through the ASGI send channel
+_MISSING_TOKEN_BODY = orjson.dumps(
+    {"error": "unauthorized", "error_description": "Missing or invalid Authorization header"}
+)
+_INVALID_TOKEN_BODY = orjson.dumps(
+    {"error": "unauthorized", "error_description": "Invalid or expired token"}
+)
+_FORBIDDEN_BODY = orjson.dumps(
+    {"error": "forbidden", "error_description": "Access denied: not authorized for this server"}
+)
+
+# Bearer tokens that recently passed verification and authorization:
+# token -> (valid_until, token_data). A connected MCP client sends the same
+# token on every request, so repeat hits go straight to the app without
+# re-verifying the JWT or re-checking owner/shared access (which costs a
+# robotmcp-cloud round trip for shared members). Denials aren't cached.
+AUTH_CACHE_TTL_SECONDS = 60
+AUTH_CACHE_MAXSIZE = 10_000
+
+# robotmcp-cloud shared-access answers: (robot_name, user_id) -> (valid_until, allowed).
+# valid_until is on the time.monotonic() clock.
+SHARED_ACCESS_ALLOWED_TTL_SECONDS = 60
+SHARED_ACCESS_DENIED_TTL_SECONDS = 10
+SHARED_ACCESS_CACHE_MAXSIZE = 2048
+_shared_access_cache: "OrderedDict[tuple[str, str], tuple[float, bool]]" = OrderedDict()
+
+# Shared client for robotmcp-cloud calls, so access checks reuse a pooled
+# keep-alive connection instead of a fresh TCP+TLS handshake each time.
+# Created on first use; main.py's lifespan closes it via close_http_client().
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=5.0)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared robotmcp-cloud client, if one was created."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class AuthorizationCache:
+    """Bearer tokens that recently passed verification and authorization.
+
+    Maps token -> (valid_until, token_data) on the time.time() clock, so an
+    entry never outlives the token's own exp claim. Oldest entries are
+    evicted past maxsize.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+    def get(self, token: str, now: float) -> Optional[dict]:
+        """Return token data for a recently authorized token, or None."""
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        valid_until, token_data = entry
+        if valid_until > now:
+            return token_data
+        del self._entries[token]
+        return None
+
+    def put(self, token: str, token_data: dict, now: float) -> None:
+        """Remember an authorized token, never past the token's own expiry."""
+        self._entries[token] = (min(now + self.ttl, token_data["exp"]), token_data)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+_auth_cache = AuthorizationCache(AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAXSIZE)
+
+
+def get_bearer_token(scope: Scope) -> Optional[str]:
+    """Return the Bearer token from an ASGI scope's Authorization header, or None.
+
+    Scans the raw header list directly instead of building a Starlette
+    Headers mapping; ASGI servers lower-case header names.
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            if value.startswith(b"Bearer ") and len(value) > 7:
+                return value[7:].decode("latin-1")
+            return None
+    return None
+
+
 async def check_shared_access(robot_name: str, user_id: str) -> bool:
-    """Check if user has shared access via robotmcp-cloud API."""
+    """Check if user has shared access via robotmcp-cloud API.
+
+    Answers are cached per (robot_name, user_id): grants for
+    SHARED_ACCESS_ALLOWED_TTL_SECONDS, denials for the shorter
+    SHARED_ACCESS_DENIED_TTL_SECONDS so a newly shared member gets in
+    quickly. Failed lookups aren't cached.
+    """
+    key = (robot_name, user_id)
+    entry = _shared_access_cache.get(key)
+    if entry is not None:
+        valid_until, allowed = entry
+        if valid_until > time.monotonic():
+            return allowed
+        del _shared_access_cache[key]
+
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.post(
-                f"{ROBOTMCP_CLOUD_URL}/api/check-access",
-                params={"robot_name": robot_name, "user_id": user_id}
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("allowed", False)
+        response = await _get_http_client().post(
+            f"{ROBOTMCP_CLOUD_URL}/api/check-access",
+            params={"robot_name": robot_name, "user_id": user_id}
+        )
+        if response.status_code == 200:
+            data = response.json()
+            allowed = bool(data.get("allowed", False))
+            ttl = SHARED_ACCESS_ALLOWED_TTL_SECONDS if allowed else SHARED_ACCESS_DENIED_TTL_SECONDS
+            # Start the TTL once the answer is in, not before the round trip
+            _shared_access_cache[key] = (time.monotonic() + ttl, allowed)
+            if len(_shared_access_cache) > SHARED_ACCESS_CACHE_MAXSIZE:
+                _shared_access_cache.popitem(last=False)
+            return allowed
     except Exception as e:
         logger.warning(f"[AUTH] Error checking shared access via cloud: {e}")
     return False
 
 
-class MCPOAuthMiddleware(BaseHTTPMiddleware):
-    """Middleware to validate OAuth Bearer tokens for Streamable HTTP MCP endpoint."""
+async def _send_error(send: Send, status: int, body: bytes, www_authenticate: bool = False) -> None:
+    """Send a complete JSON error response over the raw ASGI channel."""
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    if www_authenticate:
+        headers.append((b"www-authenticate", _www_authenticate))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
 
-    async def dispatch(self, request: Request, call_next):
-        server_url = get_server_url()
+class MCPOAuthMiddleware:
+    """Pure ASGI middleware to validate OAuth Bearer tokens for Streamable HTTP MCP endpoint.
+
+    Written against the raw ASGI interface rather than BaseHTTPMiddleware, so
+    authorized requests go straight to the MCP app without being wrapped in
+    Request/Response objects and an extra task.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
         # Check Bearer token
-        auth_header = request.headers.get("Authorization", "")
-        if not auth_header.startswith("Bearer "):
+        token = get_bearer_token(scope)
+        if token is None:
             logger.info("[AUTH] Request rejected: no Bearer token")
-            return JSONResponse(
-                {"error": "unauthorized", "error_description": "Missing or invalid Authorization header"},
-                status_code=401,
-                headers={"WWW-Authenticate": f'Bearer resource_metadata="{server_url}/.well-known/oauth-protected-resource"'}
-            )
+            await _send_error(send, 401, _MISSING_TOKEN_BODY, www_authenticate=True)
+            return
 
-        token = auth_header[7:]
+        # Fast path: token already verified and authorized recently
+        now = time.time()
+        if _auth_cache.get(token, now) is not None:
+            await self.app(scope, receive, send)
+            return
 
         # Verify JWT token (stateless - no storage lookup needed)
-        token_data = verify_access_token(token, issuer=server_url)
+        token_data = verify_access_token(token, issuer=_server_url)
 
         if not token_data:
             logger.info("[AUTH] Request rejected: invalid or expired token")
-            return JSONResponse(
-                {"error": "unauthorized", "error_description": "Invalid or expired token"},
-                status_code=401,
-                headers={"WWW-Authenticate": f'Bearer resource_metadata="{server_url}/.well-known/oauth-protected-resource"'}
-            )
+            await _send_error(send, 401, _INVALID_TOKEN_BODY, www_authenticate=True)
+            return
 
         # Check authorization (creator or shared member)
-        creator_user_id = _config.user_id
         connecting_user_id = token_data.get("sub")  # JWT uses 'sub' for user ID
 
         # Fast path: creator always has access
-        if connecting_user_id == creator_user_id:
+        if connecting_user_id == _creator_user_id:
             logger.info(f"[AUTH] Request authorized (owner): {token_data.get('email')}")
-            return await call_next(request)
+            _auth_cache.put(token, token_data, now)
+            await self.app(scope, receive, send)
+            return
 
         # Check if user is a shared member via robotmcp-cloud API
-        if _config.robot_name:
-            if await check_shared_access(_config.robot_name, connecting_user_id):
+        if _robot_name:
+            if await check_shared_access(_robot_name, connecting_user_id):
                 logger.info(f"[AUTH] Request authorized (shared member): {token_data.get('email')}")
-                return await call_next(request)
+                _auth_cache.put(token, token_data, now)
+                await self.app(scope, receive, send)
+                return
 
         logger.warning(f"[AUTH] Access denied: user {connecting_user_id} is not authorized")
-        return JSONResponse(
-            {"error": "forbidden", "error_description": "Access denied: not authorized for this server"},
-            status_code=403
-        )
+        await _send_error(send, 403, _FORBIDDEN_BODY)
@@ -3,16 +3,191 @@
 These stores are shared between the OAuth endpoints.
 Note: Access tokens and refresh tokens are now JWT-based (stateless)
 and don't require storage - they're validated via signature verification.
+
+The short-lived login-flow stores are TTLStores: entries expire a fixed
+time after they are written, lookups ignore expired entries, and the
+background reaper (run_expiry_reaper) drops them so abandoned login flows
+don't accumulate in memory. Each store is also capped in size.
+
+The stores are deliberately in-process rather than in Redis: the server runs
+as a single process per robot, and the only state held here is a login flow
+lasting at most 10 minutes. Losing it on restart just means the user
+re-authorizes. Scaling to several workers would not help anyway, because
+FastMCP's Streamable HTTP sessions are also per-process.
+
+All access happens on the event loop thread, and no store operation
+awaits, so the stores need no locks. Keep it that way: don't touch them
+from run_in_threadpool callables or other threads.
 """
 
-# OAuth client registration (dynamic client registration)
-registered_clients: dict[str, dict] = {}
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass(slots=True)
+class PendingAuthorization:
+    """OAuth parameters captured at /authorize for one login session."""
+
+    client_id: str
+    redirect_uri: str
+    scope: str
+    state_query: str  # "&state=..." ready to append to the redirect, or ""
+    code_challenge_digest: bytes  # Raw SHA-256 digest, b"" if no PKCE
+    code_challenge_method: str
+    client_secret_required: bool  # Client registered for client_secret_post
+
+
+@dataclass(slots=True)
+class AuthorizationCode:
+    """An issued authorization code awaiting exchange at /token."""
+
+    client_id: str
+    redirect_uri: str
+    scope: str
+    code_challenge_digest: bytes
+    code_challenge_method: str
+    client_secret_required: bool
+    user_id: Optional[str]
+    user_email: Optional[str]
+
+
+@dataclass(slots=True)
+class RegisteredClient:
+    """A client registered through /register (RFC 7591)."""
+
+    client_id: str
+    client_secret: str
+    client_name: str
+    redirect_uris: list[str]
+    grant_types: list[str]
+    response_types: list[str]
+    token_endpoint_auth_method: str
+    created_at: int
+
+
+@dataclass(slots=True)
+class AuthenticatedUser:
+    """The user who signed in for one login session."""
+
+    email: Optional[str]
+    user_id: Optional[str]
+
+
+class TTLStore:
+    """Size-capped mapping whose entries expire ttl seconds after being set.
+
+    Every entry gets the same lifetime, so insertion order is expiry order:
+    expired entries are always at the front of the OrderedDict and expire()
+    pops them without scanning the rest. Membership tests and get() treat
+    an expired entry as missing (and drop it); indexing returns whatever is
+    still stored, so the usual "if key in store: store[key]" can't race the
+    clock. Past maxsize the oldest entry is evicted. Deadlines are on the
+    time.monotonic() clock, so wall-clock steps can't expire or revive entries.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        # Re-setting a key moves it to the back with a fresh expiry
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key][1]
+
+    def __delitem__(self, key: str) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: str) -> bool:
+        return self._live_entry(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._live_entry(key)
+        return default if entry is None else entry[1]
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def expire(self, now: float = None) -> int:
+        """Drop every expired entry; returns how many were removed.
+
+        now, if given, must be a time.monotonic() reading.
+        """
+        if now is None:
+            now = time.monotonic()
+        data = self._data
+        removed = 0
+        while data:
+            expires_at, _ = next(iter(data.values()))
+            if expires_at > now:
+                break
+            data.popitem(last=False)
+            removed += 1
+        return removed
+
+    def _live_entry(self, key: str) -> Optional[tuple[float, Any]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+
+# Lifetime and size cap of the login-flow stores
+FLOW_TTL_SECONDS = 600  # 10 minutes
+FLOW_STORE_MAXSIZE = 10_000
+
+# OAuth client registration (dynamic client registration). Registrations don't
+# expire, but /register is unauthenticated, so only the newest are kept. That
+# lets anyone evict any client by registering enough new ones: an evicted
+# client has to register again, and grants issued to a client_secret_post
+# client are refused at /token once its secret can no longer be checked
+# (see AuthorizationCode.client_secret_required).
+REGISTERED_CLIENTS_MAXSIZE = 10_000
+registered_clients: dict[str, RegisteredClient] = {}
 
 # Authorization codes (short-lived, used in code exchange)
-authorization_codes: dict[str, dict] = {}
+authorization_codes = TTLStore(FLOW_TTL_SECONDS, FLOW_STORE_MAXSIZE)
 
 # Pending OAuth authorization requests (session_id -> oauth params)
-pending_authorizations: dict[str, dict] = {}
+pending_authorizations = TTLStore(FLOW_TTL_SECONDS, FLOW_STORE_MAXSIZE)
 
 # Authenticated user sessions (session_id -> user info)
-authenticated_sessions: dict[str, dict] = {}
+authenticated_sessions = TTLStore(FLOW_TTL_SECONDS, FLOW_STORE_MAXSIZE)
+
+_flow_stores = (authorization_codes, pending_authorizations, authenticated_sessions)
+
+# How often the background reaper runs (seconds)
+REAPER_INTERVAL_SECONDS = 30
+
+
+def reap_expired(now: float = None) -> int:
+    """Remove every expired entry from the login-flow stores.
+
+    Returns:
+        The number of entries removed from the stores.
+    """
+    if now is None:
+        now = time.monotonic()
+    return sum(store.expire(now) for store in _flow_stores)
+
+
+async def run_expiry_reaper(interval: float = REAPER_INTERVAL_SECONDS) -> None:
+    """Background task that periodically reaps expired store entries."""
+    while True:
+        await asyncio.sleep(interval)
+        reap_expired()
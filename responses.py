@@ -0,0 +1,18 @@
+"""Shared response classes.
+
+ORJSONResponse mirrors fastapi.responses.ORJSONResponse, which newer FastAPI
+releases deprecate, so the app keeps orjson serialization on any supported
+FastAPI version.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse that serializes with orjson straight to bytes."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
@@ -6,15 +6,16 @@ Uses JWT for stateless token validation - tokens survive server restarts.
 """
 
 import logging
+import time
 
-from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
 from starlette.responses import Response
 
 from mcp.server.sse import SseServerTransport
 
 from oauth.jwt_utils import verify_access_token
-from oauth.middleware import check_shared_access
+from oauth.middleware import AuthorizationCache, check_shared_access, get_bearer_token
+from responses import ORJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +25,37 @@ router = APIRouter(tags=["sse"])
 # SSE transport instance
 sse_transport = SseServerTransport("/message")
 
+
+class _AlreadySentResponse(Response):
+    """Placeholder returned once the SSE transport has written the response.
+
+    connect_sse and handle_post_message send the HTTP response themselves
+    through request._send; returning a real Response would make Starlette
+    dispatch a second http.response.start for the same request.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        pass
+
+
+_ALREADY_SENT = _AlreadySentResponse()
+
+
+# Bearer tokens that recently passed verification and authorization:
+# token -> (valid_until, token_data). Legacy SSE clients POST /message with
+# the same token for every call, so repeat hits skip check_authorization
+# (and its robotmcp-cloud round trip for shared members). Denials aren't cached.
+AUTH_CACHE_TTL_SECONDS = 30
+AUTH_CACHE_MAXSIZE = 1024
+_auth_cache = AuthorizationCache(AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAXSIZE)
+
 # These will be set by init_sse_routes()
 _server_url: str = ""
-_local_config = None
+_creator_user_id = None
+_robot_name = None
 _mcp = None
+_init_options = None
+_www_authenticate_headers: dict = {}
 
 
 def init_sse_routes(server_url: str, local_config, mcp_instance):
@@ -40,119 +68,131 @@ def init_sse_routes(server_url: str, local_config, mcp_instance):
 
     Must be called before including the router in the app.
     """
-    global _server_url, _local_config, _mcp
+    global _server_url, _creator_user_id, _robot_name, _mcp, _init_options, _www_authenticate_headers
     _server_url = server_url
-    _local_config = local_config
+    # Only these two config fields are needed per request; read them once
+    _creator_user_id = local_config.user_id if local_config else None
+    _robot_name = local_config.robot_name if local_config else None
     _mcp = mcp_instance
+    # The tools are all registered by now, so the options every session gets are fixed
+    _init_options = mcp_instance._mcp_server.create_initialization_options()
+    # Same for every 401, so build it once
+    _www_authenticate_headers = {
+        "WWW-Authenticate": f'Bearer resource_metadata="{server_url}/.well-known/oauth-protected-resource"'
+    }
 
 
-def unauthorized_response(error_description: str) -> JSONResponse:
+class SSEAuthError(Exception):
+    """Authentication/authorization failure raised by require_token.
+
+    Rendered by sse_auth_error_handler, which main.py registers on the app.
+    """
+
+    def __init__(self, status_code: int, error_description: str):
+        super().__init__(error_description)
+        self.status_code = status_code
+        self.error_description = error_description
+
+
+def unauthorized_response(error_description: str) -> ORJSONResponse:
     """Return 401 with WWW-Authenticate header pointing to resource metadata (RFC 9728)."""
-    return JSONResponse(
+    return ORJSONResponse(
         {"error": "unauthorized", "error_description": error_description},
         status_code=401,
-        headers={
-            "WWW-Authenticate": f'Bearer resource_metadata="{_server_url}/.well-known/oauth-protected-resource"'
-        }
+        headers=_www_authenticate_headers
     )
 
 
-def forbidden_response(error_description: str) -> JSONResponse:
+def forbidden_response(error_description: str) -> ORJSONResponse:
     """Return 403 Forbidden response for unauthorized access."""
-    return JSONResponse(
+    return ORJSONResponse(
         {"error": "forbidden", "error_description": error_description},
         status_code=403
     )
 
 
+async def sse_auth_error_handler(request: Request, exc: SSEAuthError) -> ORJSONResponse:
+    """Exception handler turning SSEAuthError into the 401/403 JSON response."""
+    if exc.status_code == 401:
+        return unauthorized_response(exc.error_description)
+    return forbidden_response(exc.error_description)
+
+
 async def check_authorization(token_data: dict) -> bool:
-    """Check if the token belongs to an authorized user (owner or shared member)."""
-    creator_user_id = _local_config.user_id if _local_config else None
+    """Check if the token belongs to an authorized user (owner or shared member).
+
+    Raises:
+        SSEAuthError: 403 if the user is neither the owner nor a shared member.
+    """
     connecting_user_id = token_data.get("sub")  # JWT uses 'sub' for user ID
 
-    if not creator_user_id:
-        logger.info("[SSE] No creator configured, allowing access")
+    if not _creator_user_id:
+        logger.debug("[SSE] No creator configured, allowing access")
         return True
 
     # Fast path: owner always has access
-    if connecting_user_id == creator_user_id:
-        logger.info(f"[SSE] Request authorized (owner): {token_data.get('email')}")
+    if connecting_user_id == _creator_user_id:
+        logger.debug("[SSE] Request authorized (owner): %s", token_data.get("email"))
         return True
 
     # Check if user is a shared member via robotmcp-cloud API
-    robot_name = _local_config.robot_name if _local_config else None
-    if robot_name:
-        if await check_shared_access(robot_name, connecting_user_id):
-            logger.info(f"[SSE] Request authorized (shared member): {token_data.get('email')}")
+    if _robot_name:
+        if await check_shared_access(_robot_name, connecting_user_id):
+            logger.debug("[SSE] Request authorized (shared member): %s", token_data.get("email"))
             return True
 
-    logger.warning(f"[SSE] Access denied: user {connecting_user_id} is not authorized")
-    raise HTTPException(
-        status_code=403,
-        detail="Access denied: not authorized for this server"
-    )
+    logger.warning("[SSE] Access denied: user %s is not authorized", connecting_user_id)
+    raise SSEAuthError(403, "Access denied: not authorized for this server")
 
 
-@router.get("/sse")
-async def sse_endpoint(request: Request) -> Response:
-    """Legacy SSE endpoint for MCP client connections (backward compatibility)."""
-    logger.info("[SSE] Legacy SSE endpoint hit")
-    auth_header = request.headers.get("Authorization", "")
+async def require_token(request: Request) -> dict:
+    """FastAPI dependency: authenticate and authorize the request's Bearer token.
 
-    if not auth_header.startswith("Bearer "):
-        logger.info("[SSE] Request rejected: no Bearer token")
-        return unauthorized_response("Missing or invalid Authorization header")
+    Returns:
+        The verified token payload.
 
-    token = auth_header[7:]
+    Raises:
+        SSEAuthError: 401 for a missing/invalid token, 403 for an unauthorized user.
+    """
+    token = get_bearer_token(request.scope)
 
-    # Verify JWT token (stateless - no storage lookup needed)
-    token_data = verify_access_token(token, issuer=_server_url)
+    if token is None:
+        logger.info("[SSE] Request rejected: no Bearer token")
+        raise SSEAuthError(401, "Missing or invalid Authorization header")
+
+    now = time.time()
+    token_data = _auth_cache.get(token, now)
+    if token_data is None:
+        # Verify JWT token (stateless - no storage lookup needed)
+        token_data = verify_access_token(token, issuer=_server_url)
 
-    if not token_data:
-        logger.info("[SSE] Request rejected: invalid or expired token")
-        return unauthorized_response("Invalid or expired token")
+        if not token_data:
+            logger.info("[SSE] Request rejected: invalid or expired token")
+            raise SSEAuthError(401, "Invalid or expired token")
 
-    try:
         await check_authorization(token_data)
-    except HTTPException as e:
-        return forbidden_response(e.detail)
+        _auth_cache.put(token, token_data, now)
+
+    return token_data
+
 
-    logger.info(f"[SSE] Connection established for user: {token_data.get('email')}")
+@router.get("/sse")
+async def sse_endpoint(request: Request, token_data: dict = Depends(require_token)) -> Response:
+    """Legacy SSE endpoint for MCP client connections (backward compatibility)."""
+    logger.info("[SSE] Connection established for user: %s", token_data.get("email"))
     async with sse_transport.connect_sse(
         request.scope, request.receive, request._send
     ) as streams:
-        await _mcp._mcp_server.run(
-            streams[0], streams[1], _mcp._mcp_server.create_initialization_options()
-        )
+        await _mcp._mcp_server.run(streams[0], streams[1], _init_options)
 
-    return Response()
+    return _ALREADY_SENT
 
 
 @router.post("/message")
-async def message_endpoint(request: Request) -> Response:
+async def message_endpoint(request: Request, token_data: dict = Depends(require_token)) -> Response:
     """Legacy message endpoint for SSE transport (backward compatibility)."""
-    auth_header = request.headers.get("Authorization", "")
-
-    if not auth_header.startswith("Bearer "):
-        logger.info("[SSE] Message rejected: no Bearer token")
-        return unauthorized_response("Missing or invalid Authorization header")
-
-    token = auth_header[7:]
-
-    # Verify JWT token (stateless - no storage lookup needed)
-    token_data = verify_access_token(token, issuer=_server_url)
-
-    if not token_data:
-        logger.info("[SSE] Message rejected: invalid or expired token")
-        return unauthorized_response("Invalid or expired token")
-
-    try:
-        await check_authorization(token_data)
-    except HTTPException as e:
-        return forbidden_response(e.detail)
-
-    logger.info(f"[SSE] Message received from user: {token_data.get('email')}")
+    logger.debug("[SSE] Message received from user: %s", token_data.get("email"))
     await sse_transport.handle_post_message(
         request.scope, request.receive, request._send
     )
-    return Response()
+    return _ALREADY_SENT
@@ -0,0 +1,9 @@
+"""Shared test setup: import the app modules from the repo root."""
+
+import os
+import sys
+
+# Keep tests from reading or writing the real ~/.simple-mcp-server/jwt_secret
+os.environ.setdefault("JWT_SECRET", "test-secret-" + "x" * 32)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
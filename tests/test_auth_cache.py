@@ -0,0 +1,31 @@
+"""The AuthorizationCache class; the middleware and /sse each keep their own instance."""
+
+from oauth.middleware import AuthorizationCache
+
+
+def test_cached_token_served_within_ttl():
+    cache = AuthorizationCache(ttl=60, maxsize=10)
+    token_data = {"sub": "user-1", "exp": 2_000}
+    cache.put("tok", token_data, now=1_000)
+    assert cache.get("tok", now=1_030) is token_data
+
+
+def test_expired_token_not_served():
+    cache = AuthorizationCache(ttl=60, maxsize=10)
+    # The token's own exp comes before the cache TTL runs out
+    cache.put("tok", {"sub": "user-1", "exp": 1_010}, now=1_000)
+    assert cache.get("tok", now=1_010) is None
+
+
+def test_entry_dropped_after_ttl():
+    cache = AuthorizationCache(ttl=30, maxsize=10)
+    cache.put("tok", {"sub": "user-1", "exp": 5_000}, now=1_000)
+    assert cache.get("tok", now=1_030) is None
+
+
+def test_oldest_entry_evicted_past_maxsize():
+    cache = AuthorizationCache(ttl=60, maxsize=2)
+    for token in ("a", "b", "c"):
+        cache.put(token, {"sub": token, "exp": 5_000}, now=1_000)
+    assert cache.get("a", now=1_000) is None
+    assert cache.get("c", now=1_000) is not None
@@ -0,0 +1,48 @@
+"""PKCE parameter validation at /authorize."""
+
+import base64
+import hashlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from oauth.endpoints import init_oauth_routes, router
+
+CHALLENGE = base64.urlsafe_b64encode(hashlib.sha256(b"v" * 50).digest()).rstrip(b"=").decode()
+
+
+@pytest.fixture
+def client():
+    init_oauth_routes("http://testserver", None)
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app, follow_redirects=False) as c:
+        yield c
+
+
+def authorize(client, **params):
+    return client.get("/authorize", params={"client_id": "c", "redirect_uri": "https://client/cb", **params})
+
+
+def test_s256_challenge_accepted(client):
+    r = authorize(client, code_challenge=CHALLENGE, code_challenge_method="S256")
+    assert r.status_code == 302
+
+
+def test_plain_method_rejected(client):
+    r = authorize(client, code_challenge=CHALLENGE, code_challenge_method="plain")
+    assert r.status_code == 400
+    assert r.json()["error"] == "invalid_request"
+
+
+@pytest.mark.parametrize("challenge", [
+    CHALLENGE[:-1],                      # too short
+    "+" + CHALLENGE[1:],                 # standard-base64 character
+    CHALLENGE[:-1] + "B",                # non-zero trailing bits
+])
+def test_malformed_challenge_rejected(client, challenge):
+    assert CHALLENGE[-1] != "B"
+    r = authorize(client, code_challenge=challenge)
+    assert r.status_code == 400
+    assert r.json()["error"] == "invalid_request"
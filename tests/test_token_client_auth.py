@@ -0,0 +1,136 @@
+"""Client authentication on the /token authorization_code grant."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import oauth.endpoints
+from oauth.endpoints import init_oauth_routes, router
+from oauth.stores import AuthorizationCode, authorization_codes, registered_clients
+
+
+@pytest.fixture
+def client():
+    init_oauth_routes("http://testserver", None)
+    registered_clients.clear()
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app, follow_redirects=False) as c:
+        yield c
+
+
+@pytest.fixture
+def registered(client):
+    r = client.post("/register", json={
+        "client_name": "test",
+        "redirect_uris": ["https://client/cb"],
+        "token_endpoint_auth_method": "client_secret_post",
+    })
+    assert r.status_code == 201
+    return r.json()
+
+
+def issue_code(client_id: str) -> str:
+    code = f"code-for-{client_id}"
+    authorization_codes[code] = AuthorizationCode(
+        client_id=client_id,
+        redirect_uri="https://client/cb",
+        scope="mcp:tools",
+        code_challenge_digest=b"",
+        code_challenge_method="S256",
+        client_secret_required=True,
+        user_id="user-1",
+        user_email="user@example.com",
+    )
+    return code
+
+
+def test_correct_client_and_secret_accepted(client, registered):
+    code = issue_code(registered["client_id"])
+    r = client.post("/token", data={
+        "grant_type": "authorization_code",
+        "code": code,
+        "client_id": registered["client_id"],
+        "client_secret": registered["client_secret"],
+    })
+    assert r.status_code == 200
+    assert "access_token" in r.json()
+
+
+def test_omitted_client_id_rejected(client, registered):
+    code = issue_code(registered["client_id"])
+    r = client.post("/token", data={"grant_type": "authorization_code", "code": code})
+    assert r.status_code == 401
+    assert r.json()["error"] == "invalid_client"
+
+
+def test_wrong_client_id_rejected(client, registered):
+    code = issue_code(registered["client_id"])
+    r = client.post("/token", data={
+        "grant_type": "authorization_code",
+        "code": code,
+        "client_id": "some-other-client",
+    })
+    assert r.status_code == 401
+    assert r.json()["error"] == "invalid_client"
+
+
+def test_wrong_secret_rejected(client, registered):
+    code = issue_code(registered["client_id"])
+    r = client.post("/token", data={
+        "grant_type": "authorization_code",
+        "code": code,
+        "client_id": registered["client_id"],
+        "client_secret": "not-the-secret",
+    })
+    assert r.status_code == 401
+    assert r.json()["error"] == "invalid_client"
+
+
+def authorize_and_consent(client, client_id: str) -> str:
+    """Run /authorize, the demo login and consent; return the issued code."""
+    r = client.get("/authorize", params={"client_id": client_id, "redirect_uri": "https://client/cb"})
+    session = r.headers["location"].split("session=")[1]
+    client.post("/login", data={"session": session, "email": "user@example.com", "password": "secret1"})
+    r = client.post("/consent", data={"session": session, "action": "allow"})
+    return r.headers["location"].split("code=")[1].split("&")[0]
+
+
+def test_evicted_client_still_needs_secret(client, registered, monkeypatch):
+    code = authorize_and_consent(client, registered["client_id"])
+
+    # Push the confidential client out of the registry with a new registration
+    monkeypatch.setattr(oauth.endpoints, "REGISTERED_CLIENTS_MAXSIZE", 1)
+    client.post("/register", json={"client_name": "other", "redirect_uris": ["https://other/cb"]})
+    assert registered["client_id"] not in oauth.endpoints.registered_clients
+
+    r = client.post("/token", data={
+        "grant_type": "authorization_code",
+        "code": code,
+        "client_id": registered["client_id"],
+    })
+    assert r.status_code == 401
+    assert r.json()["error"] == "invalid_client"
+
+
+def test_evicted_client_cannot_refresh_without_secret(client, registered, monkeypatch):
+    code = authorize_and_consent(client, registered["client_id"])
+    r = client.post("/token", data={
+        "grant_type": "authorization_code",
+        "code": code,
+        "client_id": registered["client_id"],
+        "client_secret": registered["client_secret"],
+    })
+    assert r.status_code == 200
+    refresh_token = r.json()["refresh_token"]
+
+    monkeypatch.setattr(oauth.endpoints, "REGISTERED_CLIENTS_MAXSIZE", 1)
+    client.post("/register", json={"client_name": "other", "redirect_uris": ["https://other/cb"]})
+
+    r = client.post("/token", data={
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token,
+        "client_id": registered["client_id"],
+    })
+    assert r.status_code == 401
+    assert r.json()["error"] == "invalid_client"
@@ -24,7 +24,7 @@ def echo(message: str) -> str:
     Returns:
         The echoed message with a prefix
     """
-    logger.info(f"[TOOL] echo invoked, message length: {len(message)}")
+    logger.info("[TOOL] echo invoked, message length: %d", len(message))
     return f"Echo: {message}"
 
 